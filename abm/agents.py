@@ -1,12 +1,14 @@
 import random
 
+import numpy as np
+
 from typing import DefaultDict
 from abc import ABC, abstractmethod
 from collections import defaultdict
 from sortedcontainers import SortedList
 
 from .market import Market
-from .exceptions import InsufficientBalance, NotEnoughItems, DuplicateBuyOrder
+from .exceptions import InsufficientBalance, NotEnoughItems
 from .models import (
     AgentType,
     ItemCategory,
@@ -45,6 +47,9 @@ class Agent(ABC):
         "impulsivity",
         "inventory",
         "containers_opened",
+        "_inv_keys",
+        "_inv_key_pos",
+        "_unlocked_qty_cache",
     )
 
     def __init__(
@@ -67,6 +72,14 @@ class Agent(ABC):
 
         self.containers_opened: int = 0
 
+        # Parallel key list kept in sync with inventory for O(1) random picks
+        self._inv_keys: list[MarketHashName] = []
+        self._inv_key_pos: dict[MarketHashName, int] = {}
+
+        # Per-item unlocked quantity memoized for the current step; entries
+        # are dropped whenever the item's lots change
+        self._unlocked_qty_cache: dict[MarketHashName, tuple[int, int]] = {}
+
     @abstractmethod
     def act(self) -> None:
         raise NotImplementedError("This method is implemented in sub-classes")
@@ -77,21 +90,58 @@ class Agent(ABC):
         self.balance += amount
 
     def get_unlocked_items(self, market_hash_name: MarketHashName) -> list[InventoryItem]:
-        return [
-            i for i in self.inventory.get(market_hash_name, [])
-            if i.quantity > 0
-            and (self.market.trade_lock_period == 0 or i.unlock_step <= self.market.current_step)
-        ]
+        lots = self.inventory.get(market_hash_name)
+        if not lots:
+            return []
+        if self.market.trade_lock_period == 0:
+            return list(lots)
+
+        # Lots are sorted by unlock step, so the unlocked ones form a prefix
+        return list(lots.irange_key(max_key=self.market.current_step))
 
     def total_unlocked_quantity(self, market_hash_name: MarketHashName) -> int:
-        return sum(i.quantity for i in self.get_unlocked_items(market_hash_name))
+        step = self.market.current_step
+        cached = self._unlocked_qty_cache.get(market_hash_name)
+        if cached is not None and cached[0] == step:
+            return cached[1]
+
+        quantity = sum(i.quantity for i in self.get_unlocked_items(market_hash_name))
+        self._unlocked_qty_cache[market_hash_name] = (step, quantity)
+        return quantity
 
     def has_item(self, market_hash_name: MarketHashName, quantity: int) -> bool:
         """Checks if Agent has enough number of items"""
         return self.total_unlocked_quantity(market_hash_name) >= quantity
 
+    def _track_inventory_key(self, market_hash_name: MarketHashName):
+        if market_hash_name not in self._inv_key_pos:
+            self._inv_key_pos[market_hash_name] = len(self._inv_keys)
+            self._inv_keys.append(market_hash_name)
+
+    def _untrack_inventory_key(self, market_hash_name: MarketHashName):
+        """Swap-pop removal keeping the key list O(1) to update."""
+        pos = self._inv_key_pos.pop(market_hash_name, None)
+        if pos is None:
+            return
+        last = self._inv_keys.pop()
+        if last != market_hash_name:
+            self._inv_keys[pos] = last
+            self._inv_key_pos[last] = pos
+
     def add_item(self, item: MarketItem, quantity: int = 1, unlock_step: int = 0):
-        self.inventory[item.market_hash_name].add(
+        self._track_inventory_key(item.market_hash_name)
+        self._unlocked_qty_cache.pop(item.market_hash_name, None)
+        lots = self.inventory[item.market_hash_name]
+
+        # Merge into an existing lot with the same unlock step instead of
+        # allocating a new InventoryItem per drop/purchase. Keeps inventories
+        # compact: one lot per (item, unlock_step) rather than one per event.
+        idx = lots.bisect_key_left(unlock_step)
+        if idx < len(lots) and lots[idx].unlock_step == unlock_step:
+            lots[idx].quantity += quantity
+            return
+
+        lots.add(
             InventoryItem(
                 item=item,
                 quantity=quantity,
@@ -121,6 +171,8 @@ class Agent(ABC):
         if total_available < quantity:
             raise NotEnoughItems("Not enough items in inventory!")
 
+        self._unlocked_qty_cache.pop(market_hash_name, None)
+
         remaining = quantity
         for i in unlocked_items:
             take = min(i.quantity, remaining)
@@ -135,6 +187,7 @@ class Agent(ABC):
 
         if not self.inventory[market_hash_name]:
             del self.inventory[market_hash_name]
+            self._untrack_inventory_key(market_hash_name)
 
     def open_container(self, container: Container, quantity: int = 1) -> None:
         """
@@ -170,21 +223,22 @@ class Agent(ABC):
 
     def _panic_sell(self):
         """Impulsive decision, agent tries to sell all of his items"""
-        for item_name, inventory_list in list(self.inventory.items()):
-            if not inventory_list:
+        # One batched draw instead of a random.uniform call per item
+        jitter = np.random.uniform(0.0, 1.0, size=len(self.inventory))
+        for item_name, u in zip(list(self.inventory), jitter):
+            if not self.inventory.get(item_name):
                 continue
-            
+
             unlocked_items = self.get_unlocked_items(item_name)
             if not unlocked_items:
                 continue
 
-            buy_orders = self.market.get_item_buy_orders(item_name)
-            if not buy_orders:
+            highest_bid = self.market.best_bid(item_name)
+            if highest_bid is None:
                 base_price = self.market.get_base_price(item_name)
-                price = max(int(base_price * random.uniform(0.85, 1.0)), MIN_PRICE)
+                price = max(int(base_price * (0.85 + 0.15 * u)), MIN_PRICE)
             else:
-                highest_price = buy_orders[0].price
-                price = max(int(highest_price * random.uniform(0.8, 1.0)), MIN_PRICE)
+                price = max(int(highest_bid * (0.8 + 0.2 * u)), MIN_PRICE)
 
             for i in unlocked_items:
                 if i.quantity == 0:
@@ -218,8 +272,7 @@ class NoviceAgent(Agent):
 
         He either buys or sells. There is a chance of panic sell happening based on Agent's impulsivity.
         """
-        action = random.choice(['buy', 'sell'])
-        if action == 'buy':
+        if random.random() < 0.5:
             self.buy_to_open_containers()
         else:
             self.sell_items()
@@ -236,29 +289,20 @@ class NoviceAgent(Agent):
             return
 
         container = random.choice(available_containers)
-        sell_orders = self.market.get_item_sell_orders(market_hash_name=container.market_hash_name)
-        if not sell_orders:
-            return
-
-        max_price = 0
-        total_spent = 0
-        max_affordable_quantity = 0
-
-        for sell_order in sell_orders:
-            affordable_quantity = (self.balance - total_spent) // sell_order.price
-            if affordable_quantity <= 0:
-                break
-
-            quantity_to_buy = min(sell_order.quantity, affordable_quantity)
-            max_price = sell_order.price
-            total_spent += max_price * quantity_to_buy
-            max_affordable_quantity += quantity_to_buy
-
+        max_affordable_quantity, max_price = self.market.get_affordable_quantity(
+            market_hash_name=container.market_hash_name,
+            budget=self.balance
+        )
         if max_affordable_quantity == 0:
             return
 
         desired_quantity = random.randint(1, max_affordable_quantity)
 
+        # Cancel any stale Buy Order up front instead of catching DuplicateBuyOrder
+        existing_order_id = self.market.has_active_buy_order(self.id, container.market_hash_name)
+        if existing_order_id is not None:
+            self.market.cancel_buy_order(market_hash_name=container.market_hash_name, order_id=existing_order_id)
+
         for _ in range(3):
             try:
                 bought_quantity = self.market.buy(self.id, container, max_price, desired_quantity)
@@ -267,8 +311,6 @@ class NoviceAgent(Agent):
                 break
             except InsufficientBalance:
                 self.sell_items()
-            except DuplicateBuyOrder as ex:
-                self.market.cancel_buy_order(market_hash_name=container.market_hash_name, order_id=ex.order_id)
 
     def sell_items(self):
         """
@@ -282,7 +324,7 @@ class NoviceAgent(Agent):
             return self._panic_sell()
 
         # Regular strategy: Agent tries to sell items cheaper than the lowest listing
-        market_hash_name = random.choice(list(self.inventory.keys()))
+        market_hash_name = random.choice(self._inv_keys)
         inventory_list = self.inventory[market_hash_name]
         if not inventory_list:
             return
@@ -293,10 +335,9 @@ class NoviceAgent(Agent):
 
         quantity = random.randint(1, unlocked_quantity)
 
-        sell_orders = self.market.get_item_sell_orders(market_hash_name=item.market_hash_name)
-        if sell_orders:
-            lowest_sell_order = sell_orders[0].price
-            price = lowest_sell_order - random.randint(ONE_CENT, ONE_DOLLAR)
+        lowest_ask = self.market.best_ask(item.market_hash_name)
+        if lowest_ask is not None:
+            price = lowest_ask - random.randint(ONE_CENT, ONE_DOLLAR)
         else:
             # Pick base price
             base_price = self.market.get_base_price(market_hash_name=item.market_hash_name)
@@ -314,7 +355,7 @@ class TraderAgent(Agent):
 
     :param risk_tolerance: Chance to take a risk decision
     """
-    __slots__ = ("risk_tolerance", "entry_prices",)
+    __slots__ = ("risk_tolerance", "entry_prices", "_profit_mult",)
 
     def __init__(
             self,
@@ -328,6 +369,9 @@ class TraderAgent(Agent):
         super().__init__(agent_id, market, agent_type, balance, impulsivity)
         self.risk_tolerance = risk_tolerance
 
+        # Fee-adjusted profit multiplier, hoisted out of the per-item hot loop
+        self._profit_mult = (1 + risk_tolerance) / (1 - market.market_fee)
+
         # inconsistent with InvestorAgent
         self.entry_prices: DefaultDict[MarketHashName, list[int]] = defaultdict(list)
 
@@ -339,34 +383,26 @@ class TraderAgent(Agent):
 
         # self.try_buy_for_profit()
 
-        # For each selling item analyze its trend and spread
+        # For each selling item analyze its trend and spread (cached per step in Market)
         for item in self.market.get_available_items():
             item_name = item.market_hash_name
-            recent_sales = self.market.get_item_recent_sales(item_name, MIN_SALES_FOR_ANALYSIS)
-            if len(recent_sales) < 5:
+            stats = self.market.get_item_stats(item_name, MIN_SALES_FOR_ANALYSIS)
+            if stats is None or stats.num_sales < 5:
                 continue
 
-            prices = [sale.price for sale in recent_sales]
-
-            # Trend analysis
-            mid = len(prices) // 2
-            avg_first = sum(prices[:mid]) / mid
-            avg_second = sum(prices[mid:]) / (len(prices) - mid)
-            trend_up = avg_second > avg_first
-
-            min_price = min(prices)
-            max_price = max(prices)
-            spread = (max_price - min_price) * (1 - self.market.market_fee)
+            trend_up = stats.trend_up
+            min_price = stats.min_price
+            avg_price = stats.avg_price
+            spread = stats.spread
 
             # Try to sell items for profit
             unlocked_quantity = self.total_unlocked_quantity(item_name)
             if item_name in self.inventory and unlocked_quantity > 0:
-                buy_orders = self.market.get_item_buy_orders(item_name)
-                if buy_orders:
-                    highest_price = buy_orders[0].price
+                highest_price = stats.best_bid
+                if highest_price is not None:
                     profitable = False
                     for entry_price in self.entry_prices.get(item_name, []):
-                        desired_price = entry_price * (1 + self.risk_tolerance) / (1 - self.market.market_fee)
+                        desired_price = entry_price * self._profit_mult
                         if highest_price >= desired_price:
                             try:
                                 self.market.sell(self.id, item, highest_price, unlocked_quantity)
@@ -378,14 +414,12 @@ class TraderAgent(Agent):
                     if profitable:
                         continue
 
-            avg_price = sum(prices) / len(prices)
             buy_signal = False
 
-            sell_orders = self.market.get_item_sell_orders(item_name)
-            if not sell_orders:
+            best_ask = stats.best_ask
+            if best_ask is None:
                 continue
 
-            best_ask = sell_orders[0].price
             is_desired_price = best_ask <= min_price * (1 + self.risk_tolerance)
             buy_signal = (
                 (trend_up and is_desired_price)
@@ -396,17 +430,14 @@ class TraderAgent(Agent):
                 # Determine buy quantity based on balance and risk_tolerance
                 buy_quantity = int(self.balance // best_ask * self.risk_tolerance)
                 if buy_quantity > 0:
-                    for _ in range(3):
-                        try:
-                            bought_qty = self.market.buy(self.id, item, best_ask, buy_quantity)
-                            if bought_qty > 0:
-                                self.entry_prices[item.market_hash_name].append(best_ask)
-                                break
-                        except DuplicateBuyOrder as ex:
-                            self.market.cancel_buy_order(
-                                market_hash_name=item.market_hash_name,
-                                order_id=ex.order_id
-                            )
+                    # Cancel any stale Buy Order up front instead of catching DuplicateBuyOrder
+                    existing_order_id = self.market.has_active_buy_order(self.id, item_name)
+                    if existing_order_id is not None:
+                        self.market.cancel_buy_order(market_hash_name=item_name, order_id=existing_order_id)
+
+                    bought_qty = self.market.buy(self.id, item, best_ask, buy_quantity)
+                    if bought_qty > 0:
+                        self.entry_prices[item_name].append(best_ask)
 
 
 class InvestorAgent(Agent):
@@ -418,7 +449,7 @@ class InvestorAgent(Agent):
 
     :param risk_tolerance: Agent's degree of making risky decisions. Determines invested amount and buy price.
     """
-    __slots__ = ("risk_tolerance", "entry_prices")
+    __slots__ = ("risk_tolerance", "entry_prices", "_profit_mult")
 
     def __init__(
             self,
@@ -431,6 +462,7 @@ class InvestorAgent(Agent):
     ):
         super().__init__(agent_id, market, agent_type, balance, impulsivity)
         self.risk_tolerance = risk_tolerance
+        self._profit_mult = (1 + risk_tolerance) / (1 - market.market_fee)
         self.entry_prices: dict[MarketHashName, EntryPrice] = {}
 
     def act(self):
@@ -457,38 +489,43 @@ class InvestorAgent(Agent):
 
         sales = self.market.get_agent_sales(self.id)
 
-        bought_qty: DefaultDict[MarketHashName, int] = defaultdict(int)
-        bought_cost: DefaultDict[MarketHashName, int] = defaultdict(int)
-        sold_qty: DefaultDict[MarketHashName, int] = defaultdict(int)
+        # Map item names to dense indices, then reduce with bincount in C
+        item_index: dict[MarketHashName, int] = {}
+        purchase_idx = np.fromiter(
+            (item_index.setdefault(p.item.market_hash_name, len(item_index)) for p in purchases),
+            dtype=np.intp,
+            count=len(purchases)
+        )
+        purchase_qty = np.fromiter((p.quantity for p in purchases), dtype=np.int64, count=len(purchases))
+        purchase_cost = np.fromiter((p.quantity * p.price for p in purchases), dtype=np.int64, count=len(purchases))
 
-        for p in purchases:
-            item_name = p.item.market_hash_name
-            bought_qty[item_name] += p.quantity
-            bought_cost[item_name] += p.quantity * p.price
-        
-        for s in sales:
-            sold_qty[s.item.market_hash_name] += s.quantity
+        num_items = len(item_index)
+        bought_qty = np.bincount(purchase_idx, weights=purchase_qty, minlength=num_items)
+        bought_cost = np.bincount(purchase_idx, weights=purchase_cost, minlength=num_items)
 
-        new_entry = {}
-        for mhn, total_bought in bought_qty.items():
-            total_sold = sold_qty.get(mhn, 0)
-            net_qty = total_bought - total_sold
-            if net_qty <= 0:
-                continue
-
-            avg_buy = bought_cost[mhn] / total_bought
-            remaining_cost = bought_cost[mhn] - avg_buy * total_sold
+        sold_qty = np.zeros(num_items)
+        for s in sales:
+            idx = item_index.get(s.item.market_hash_name)
+            if idx is not None:
+                sold_qty[idx] += s.quantity
 
-            new_entry[mhn] = EntryPrice(quantity=net_qty, avg_price=int(remaining_cost / net_qty))
+        net_qty = bought_qty - sold_qty
+        avg_buy = bought_cost / bought_qty
+        remaining_cost = bought_cost - avg_buy * sold_qty
 
-        self.entry_prices = new_entry
+        self.entry_prices = {
+            mhn: EntryPrice(quantity=int(net_qty[idx]), avg_price=int(remaining_cost[idx] / net_qty[idx]))
+            for mhn, idx in item_index.items()
+            if net_qty[idx] > 0
+        }
 
     def try_take_profit(self):
         self.refresh_entry_prices_from_history()
 
         # trying to sell investments for profit, checks the price if it's already higher than desired profits
         # or just places sell order with desired price
-        for market_hash_name, inventory_list in list(self.inventory.items()):
+        for market_hash_name in list(self.inventory):
+            inventory_list = self.inventory.get(market_hash_name)
             if not inventory_list:
                 continue
 
@@ -496,13 +533,13 @@ class InvestorAgent(Agent):
             if entry_price is None:
                 continue
 
-            buy_orders = self.market.get_item_buy_orders(market_hash_name)
-            if not buy_orders:
+            stats = self.market.get_item_stats(market_hash_name)
+            if stats is None or stats.best_bid is None:
                 # Items have just appeared, investor hasn't invested yet
                 continue
 
-            highest_price = buy_orders[0].price
-            target_price = entry_price.avg_price * (1 + self.risk_tolerance) / (1 - self.market.market_fee)
+            highest_price = stats.best_bid
+            target_price = entry_price.avg_price * self._profit_mult
 
             if highest_price >= target_price:
                 item = inventory_list[0].item
@@ -525,24 +562,23 @@ class InvestorAgent(Agent):
 
         item = random.choice(available_items)
         item_name = item.market_hash_name
-        sell_orders = self.market.get_item_sell_orders(market_hash_name=item_name)
-        if not sell_orders:
+        lowest_price = self.market.best_ask(item_name)
+        if lowest_price is None:
             return
 
-        lowest_price = sell_orders[0].price
         discount = (1 - self.risk_tolerance) * MAX_DISCOUNT
         price = max(int(lowest_price * (1 - discount)), MIN_PRICE)
         quantity = int(self.balance * self.risk_tolerance // price)
 
         if quantity <= 0:
             return
-        
-        for _ in range(3):
-            try:
-                self.market.buy(self.id, item, price, quantity)
-                break
-            except DuplicateBuyOrder as ex:
-                self.market.cancel_buy_order(market_hash_name=item_name, order_id=ex.order_id)
+
+        # Cancel any stale Buy Order up front instead of catching DuplicateBuyOrder
+        existing_order_id = self.market.has_active_buy_order(self.id, item_name)
+        if existing_order_id is not None:
+            self.market.cancel_buy_order(market_hash_name=item_name, order_id=existing_order_id)
+
+        self.market.buy(self.id, item, price, quantity)
 
 
 class FarmerAgent(Agent):
@@ -578,7 +614,8 @@ class FarmerAgent(Agent):
 
     def sell_farmed_items(self):
         """Regular Sell, when Agent sells farmed items in batches"""
-        for item_name, inventory_list in list(self.inventory.items()):
+        for item_name in list(self.inventory):
+            inventory_list = self.inventory.get(item_name)
             if not inventory_list:
                 continue
 
@@ -592,11 +629,14 @@ class FarmerAgent(Agent):
             batches = random.randint(1, 10)
             batch_size = max(1, quantity // batches)
 
-            for _ in range(batches):
+            # Pre-draw all price multipliers for this item's batches at once
+            batch_prices = (base_price * np.random.uniform(0.9, 1.15, size=batches)).astype(np.int64)
+
+            for price in batch_prices:
                 if quantity <= 0:
                     break
 
-                price = int(base_price * random.uniform(0.9, 1.15))
+                price = int(price)
                 try:
                     self.market.sell(self.id, item, max(price, MIN_PRICE), batch_size)
                     quantity -= batch_size
@@ -1,6 +1,8 @@
 from __future__ import annotations
 import random
 
+import numpy as np
+
 from typing import TYPE_CHECKING
 
 from .market import Market
@@ -12,6 +14,37 @@ if TYPE_CHECKING:
     from .agents import Agent as Agent
 
 
+def _build_alias_table(weights: list[float]) -> tuple[list[float], list[int]]:
+    """
+    Builds Walker's alias table for O(1) weighted sampling.
+
+    :returns: Tuple of (probability table, alias table) for the given weights.
+    """
+    n = len(weights)
+    total = sum(weights)
+    prob = [w * n / total for w in weights]
+    alias = [0] * n
+
+    small = [i for i, p in enumerate(prob) if p < 1.0]
+    large = [i for i, p in enumerate(prob) if p >= 1.0]
+
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        alias[s] = l
+        prob[l] -= 1.0 - prob[s]
+        if prob[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+
+    # Leftovers are exactly 1.0 up to float rounding
+    for i in small + large:
+        prob[i] = 1.0
+
+    return prob, alias
+
+
 class DropGenerator:
     """
     Drop Generator imitates CS2 Weekly Drop System. Rewards Agents that play the game with an item.
@@ -33,6 +66,8 @@ class DropGenerator:
         "_eligible",
         "_items_list",
         "_weights_list",
+        "_alias_prob",
+        "_alias_alt",
         "total_drops_count",
     )
 
@@ -57,6 +92,9 @@ class DropGenerator:
 
         self._items_list = list(items_drop_pool.keys())
         self._weights_list = list(items_drop_pool.values())
+        alias_prob, alias_alt = _build_alias_table(self._weights_list)
+        self._alias_prob = np.asarray(alias_prob)
+        self._alias_alt = np.asarray(alias_alt, dtype=np.intp)
 
         self.total_drops_count = 0
 
@@ -98,13 +136,28 @@ class DropGenerator:
                 agent.add_item(self._items_list[0], drop_quantity, unlock_step=unlock_step)
                 continue
 
-            for _ in range(drop_quantity):
-                item = self._select_random_item()
-                agent.add_item(item, unlock_step=unlock_step)
+            # Draw the whole batch at once and add each distinct item a single time
+            counts = self._draw_random_items(drop_quantity)
+            for item_idx in np.flatnonzero(counts):
+                agent.add_item(self._items_list[item_idx], int(counts[item_idx]), unlock_step=unlock_step)
 
     def _select_random_item(self) -> MarketItem:
-        """Selects random item from the Active Pool with given probabilities."""
-        return random.choices(self._items_list, weights=self._weights_list, k=1)[0]
+        """Selects random item from the Active Pool with given probabilities in O(1) via the alias table."""
+        i = int(random.random() * len(self._items_list))
+        if random.random() >= self._alias_prob[i]:
+            i = int(self._alias_alt[i])
+        return self._items_list[i]
+
+    def _draw_random_items(self, quantity: int) -> np.ndarray:
+        """
+        Draws a whole batch of weighted item picks as one vectorized alias-table pass.
+
+        :returns: Array of per-item pick counts aligned with the Active Pool.
+        """
+        idx = (np.random.random(quantity) * len(self._items_list)).astype(np.intp)
+        reroll = np.random.random(quantity) >= self._alias_prob[idx]
+        idx[reroll] = self._alias_alt[idx[reroll]]
+        return np.bincount(idx, minlength=len(self._items_list))
 
     def _calculate_drop_quantity(self, agent: Agent) -> int:
         """Calculates drop quantity based on number of accounts Agent has."""
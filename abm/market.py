@@ -3,8 +3,12 @@ from typing import TYPE_CHECKING, DefaultDict, Sequence
 from collections import defaultdict
 from sortedcontainers import SortedList
 
-from .metrics import calculate_median_price
-from .constants import DEFAULT_BASE_PRICE, MIN_FEE, ONE_DOLLAR
+import numpy as np
+
+from fractions import Fraction
+
+from .metrics import RollingPriceWindow, analyze_prices, calculate_median_price
+from .constants import DEFAULT_BASE_PRICE, MIN_FEE, MIN_SALES_FOR_ANALYSIS, ONE_DOLLAR
 from .exceptions import (
     AgentDoesNotExist,
     InsufficientBalance,
@@ -18,6 +22,7 @@ from .models import (
     OrderType,
     ItemCategory,
     MarketItem,
+    ItemPriceStats,
     Order,
     Sale,
     AgentMarketHistory,
@@ -29,6 +34,16 @@ if TYPE_CHECKING:
     from .agents import Agent as Agent
 
 
+def _buy_book_key(order: Order) -> tuple[int, int]:
+    """Buy book sort key: best (highest) bid first, oldest first on ties."""
+    return (-order.price, order.step)
+
+
+def _sell_book_key(order: Order) -> tuple[int, int]:
+    """Sell book sort key: best (lowest) ask first, oldest first on ties."""
+    return (order.price, order.step)
+
+
 class Market:
     """
     Central simulation environment modeling Steam Community Market internal mechanics.
@@ -61,6 +76,10 @@ class Market:
             current_step: int = 0
     ):
         self.market_fee = market_fee
+        self._one_minus_fee = 1 - market_fee
+
+        # Fee as an exact integer ratio: deterministic, no float round-off per fill
+        self._fee_num, self._fee_den = Fraction(market_fee).limit_denominator(10_000).as_integer_ratio()
         self.steps_per_day = steps_per_day
         self.trade_lock_period = trade_lock_period
         self.lock_on_purchase = lock_on_purchase
@@ -69,13 +88,13 @@ class Market:
 
         self.agents: dict[AgentID, Agent] = {}
 
-        self.buy_orders: DefaultDict[MarketHashName, SortedList[Order]] = defaultdict(
-            lambda: SortedList(key=lambda o: (-o.price, o.step))
-        )
-        self.sell_orders: DefaultDict[MarketHashName, SortedList[Order]] = defaultdict(
-            lambda: SortedList(key=lambda o: (o.price, o.step))
-        )
+        # Plain dicts keyed by item name; books are created on first order
+        # in _add_buy_order/_add_sell_order instead of a defaultdict factory
+        self.buy_orders: dict[MarketHashName, SortedList[Order]] = {}
+        self.sell_orders: dict[MarketHashName, SortedList[Order]] = {}
         self.agent_buy_orders_idx: AgentBuyOrderIndex = defaultdict(dict)
+        self._orders_by_agent: DefaultDict[AgentID, dict[OrderID, Order]] = defaultdict(dict)
+        self._orders_by_id: dict[OrderID, Order] = {}
 
         self.items_map: dict[MarketHashName, MarketItem] = {}
         self.sales_history: DefaultDict[MarketHashName, list[Sale]] = defaultdict(list)
@@ -85,6 +104,22 @@ class Market:
 
         self.item_seed_prices: dict[MarketHashName, int] = {}
 
+        # Per-step analytics cache shared by all Agents acting on the same step
+        self._tick_cache: dict[MarketHashName, ItemPriceStats | None] = {}
+        self._tick_cache_step: int = -1
+
+        # Listed-items cache, invalidated whenever the sell book changes
+        self._available_items_cache: dict[ItemCategory | None, list[MarketItem]] = {}
+
+        # Names with at least one live Sell Order. A dict is used as an
+        # insertion-ordered set so seeded runs stay reproducible.
+        self._items_with_asks: dict[MarketHashName, None] = {}
+
+        # Incrementally maintained per-item price windows, updated on every sale
+        self._price_windows: DefaultDict[MarketHashName, RollingPriceWindow] = defaultdict(
+            lambda: RollingPriceWindow(MIN_SALES_FOR_ANALYSIS)
+        )
+
     def add_agents(self, agents: list[Agent]):
         """Register agents within the market."""
         for agent in agents:
@@ -94,7 +129,7 @@ class Market:
             agent.market = self
 
     def calculate_fee(self, order_total: int):
-        return max(int(order_total * self.market_fee), MIN_FEE)
+        return max(order_total * self._fee_num // self._fee_den, MIN_FEE)
     
     def _max_receivable_quantity(self, seller_balance: int, price: int, desired_qty: int) -> int:
         available_capacity = self.max_balance - seller_balance
@@ -103,21 +138,27 @@ class Market:
         if price <= 0:
             return 0
 
-        return min(desired_qty, int(available_capacity / (price * (1 - self.market_fee))))
+        return min(desired_qty, int(available_capacity / (price * self._one_minus_fee)))
     
     def calculate_unlock_step(self, is_trade_lock: bool = True) -> int:
         """Calculates unlock step based on a trade lock period."""
         return self.current_step + self.trade_lock_period * self.steps_per_day if is_trade_lock else 0
 
     def get_base_price(self, market_hash_name: MarketHashName, number_of_sales: int = 50) -> int:
-        median_price = calculate_median_price(self.sales_history, market_hash_name, number_of_sales)
+        # Median over the default window is maintained incrementally; other
+        # window sizes fall back to recomputation from the sales history.
+        window = self._price_windows.get(market_hash_name)
+        if window is not None and window.count > 0 and number_of_sales == window.size:
+            median_price = window.median
+        else:
+            median_price = calculate_median_price(self.sales_history, market_hash_name, number_of_sales)
         if median_price > 0:
             return median_price
 
-        buy_orders = self.get_item_buy_orders(market_hash_name)
-        if buy_orders:
-            return buy_orders[0].price
-        
+        highest_bid = self.best_bid(market_hash_name)
+        if highest_bid is not None:
+            return highest_bid
+
         # Seed price registered when item first dropped from container
         seed = self.item_seed_prices.get(market_hash_name)
         if seed:
@@ -125,6 +166,71 @@ class Market:
 
         return DEFAULT_BASE_PRICE
 
+    def get_item_stats(
+            self,
+            market_hash_name: MarketHashName,
+            number_of_sales: int = MIN_SALES_FOR_ANALYSIS
+    ) -> ItemPriceStats | None:
+        """
+        Returns cached per-item analytics (trend, spread, best bid/ask) for the current step.
+
+        Recomputed lazily once per item per step, so every Agent analyzing the same
+        item on the same step reuses a single computation. Returns None if the item
+        has no recorded sales yet.
+        """
+        if self._tick_cache_step != self.current_step:
+            self._tick_cache.clear()
+            self._tick_cache_step = self.current_step
+
+        if market_hash_name in self._tick_cache:
+            return self._tick_cache[market_hash_name]
+
+        stats = self._compute_item_stats(market_hash_name, number_of_sales)
+        self._tick_cache[market_hash_name] = stats
+        return stats
+
+    def _compute_item_stats(
+            self,
+            market_hash_name: MarketHashName,
+            number_of_sales: int
+    ) -> ItemPriceStats | None:
+        # Fast path: stats over the default window come from the incrementally
+        # maintained RollingPriceWindow in O(1), no rescan of sales history.
+        window = self._price_windows.get(market_hash_name)
+        if window is not None and window.count > 0 and number_of_sales == window.size:
+            return ItemPriceStats(
+                num_sales=window.count,
+                avg_first=window.avg_first,
+                avg_second=window.avg_second,
+                min_price=window.min,
+                max_price=window.max,
+                avg_price=window.avg,
+                trend_up=window.avg_second > window.avg_first,
+                spread=(window.max - window.min) * self._one_minus_fee,
+                best_bid=self.best_bid(market_hash_name),
+                best_ask=self.best_ask(market_hash_name),
+            )
+
+        recent_sales = self.get_item_recent_sales(market_hash_name, number_of_sales)
+        if not recent_sales:
+            return None
+
+        prices = np.fromiter((sale.price for sale in recent_sales), dtype=np.int64, count=len(recent_sales))
+        avg_first, avg_second, min_price, max_price, avg_price = analyze_prices(prices)
+
+        return ItemPriceStats(
+            num_sales=len(recent_sales),
+            avg_first=avg_first,
+            avg_second=avg_second,
+            min_price=min_price,
+            max_price=max_price,
+            avg_price=avg_price,
+            trend_up=avg_second > avg_first,
+            spread=(max_price - min_price) * self._one_minus_fee,
+            best_bid=self.best_bid(market_hash_name),
+            best_ask=self.best_ask(market_hash_name),
+        )
+
     def get_item_recent_sales(self, market_hash_name: MarketHashName, number_of_sales: int = 50) -> list[Sale]:
         """Returns a list of passed number of recent sales for market_hash_name."""
         item_sales = self.sales_history.get(market_hash_name, [])
@@ -142,13 +248,11 @@ class Market:
             "sell_orders": []
         }
 
-        if order_type in (OrderType.BUY, None):
-            for order_list in self.buy_orders.values():
-                orders["buy_orders"].extend([o for o in order_list if o.agent_id == agent_id])
-
-        if order_type in (OrderType.SELL, None):
-            for order_list in self.sell_orders.values():
-                orders["sell_orders"].extend([o for o in order_list if o.agent_id == agent_id])
+        for order in self._orders_by_agent.get(agent_id, {}).values():
+            if order_type is not None and order.type != order_type:
+                continue
+            key = "buy_orders" if order.type == OrderType.BUY else "sell_orders"
+            orders[key].append(order)
 
         return orders
     
@@ -156,7 +260,7 @@ class Market:
         """Returns an Agent instance by passed agent_id"""
         return self.agents.get(agent_id)
 
-    def _get_existing_buy_order_id(self, agent_id: AgentID, market_hash_name: MarketHashName) -> OrderID | None:
+    def has_active_buy_order(self, agent_id: AgentID, market_hash_name: MarketHashName) -> OrderID | None:
         """Checks if Agent has existing Buy Order on passed Item and returns its ID"""
         return self.agent_buy_orders_idx.get(agent_id, {}).get(market_hash_name)
 
@@ -168,15 +272,40 @@ class Market:
         """Return list of all purchases made by a specific Agent."""
         return self.agent_purchases.get(agent_id, [])
 
+    def _invalidate_available_items(self):
+        """Drops the listed-items cache after any sell book mutation."""
+        if self._available_items_cache:
+            self._available_items_cache.clear()
+
     def get_available_items(self, category_filter: ItemCategory | None = None) -> list[MarketItem]:
-        """Returns a list of all listed items on the Market filtered by category."""
-        return [
+        """
+        Returns a list of all listed items on the Market filtered by category.
+
+        Cached until the sell book changes, so repeated calls from many Agents
+        on the same step don't rebuild the list.
+        """
+        cached = self._available_items_cache.get(category_filter)
+        if cached is not None:
+            return cached
+
+        items = [
             item
-            for market_hash_name, order_list in self.sell_orders.items()
-            if order_list
-            and ((item := self.items_map.get(market_hash_name)) is not None)
+            for market_hash_name in self._items_with_asks
+            if ((item := self.items_map.get(market_hash_name)) is not None)
             and (category_filter is None or item.category == category_filter)
         ]
+        self._available_items_cache[category_filter] = items
+        return items
+
+    def best_bid(self, market_hash_name: MarketHashName) -> int | None:
+        """Returns the highest Buy Order price for given `Item` without building a list."""
+        orders = self.buy_orders.get(market_hash_name)
+        return orders[0].price if orders else None
+
+    def best_ask(self, market_hash_name: MarketHashName) -> int | None:
+        """Returns the lowest Sell Order price for given `Item` without building a list."""
+        orders = self.sell_orders.get(market_hash_name)
+        return orders[0].price if orders else None
 
     def get_item_buy_orders(self, market_hash_name: MarketHashName) -> Sequence[Order]:
         """Return a list of Buy Orders for given `Item` in descending order."""
@@ -186,6 +315,58 @@ class Market:
         """Return a list of Sell Orders for given `Item` in ascending order."""
         return self.sell_orders.get(market_hash_name, [])
 
+    def get_book_arrays(self, market_hash_name: MarketHashName, order_type: OrderType) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns one side of the book as parallel (prices, quantities) arrays.
+
+        Rows follow book order: ascending price for sells, descending for buys.
+        Lets vectorized consumers (affordability scans, plots) work on
+        contiguous arrays instead of per-Order attribute access.
+        """
+        book = self.buy_orders if order_type == OrderType.BUY else self.sell_orders
+        orders = book.get(market_hash_name)
+        if not orders:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        count = len(orders)
+        prices = np.fromiter((o.price for o in orders), dtype=np.int64, count=count)
+        quantities = np.fromiter((o.quantity for o in orders), dtype=np.int64, count=count)
+        return prices, quantities
+
+    def get_affordable_quantity(self, market_hash_name: MarketHashName, budget: int) -> tuple[int, int]:
+        """
+        Computes how many units of an item a budget can buy from the current sell book.
+
+        Walks the ask levels via cumulative cost prefix sums and a searchsorted
+        instead of a Python loop over every order.
+
+        :returns: Tuple of (max affordable quantity, price of the deepest level reached).
+        """
+        if budget <= 0:
+            return 0, 0
+
+        prices, quantities = self.get_book_arrays(market_hash_name, OrderType.SELL)
+        count = len(prices)
+        if count == 0:
+            return 0, 0
+
+        cum_cost = np.cumsum(prices * quantities)
+        cum_quantity = np.cumsum(quantities)
+
+        # Number of whole levels the budget covers
+        levels = int(np.searchsorted(cum_cost, budget, side='right'))
+        quantity = int(cum_quantity[levels - 1]) if levels else 0
+        spent = int(cum_cost[levels - 1]) if levels else 0
+
+        if levels < count:
+            partial = (budget - spent) // int(prices[levels])
+            if partial > 0:
+                return quantity + partial, int(prices[levels])
+
+        if levels == 0:
+            return 0, 0
+        return quantity, int(prices[levels - 1])
+
     def create_order(
             self,
             order_type: OrderType,
@@ -194,30 +375,49 @@ class Market:
             quantity: int,
             agent_id: AgentID
     ):
-        order = Order(
-            type=order_type,
-            item=item,
-            price=price,
-            quantity=quantity,
-            agent_id=agent_id,
-            step=self.current_step
-        )
-        market_hash_name = order.item.market_hash_name
         if order_type == OrderType.BUY:
-            self.buy_orders[market_hash_name].add(order)
-            self.agent_buy_orders_idx[agent_id][market_hash_name] = order.id
+            self._add_buy_order(item, price, quantity, agent_id)
         else:
-            self.sell_orders[market_hash_name].add(order)
-            self.items_map[market_hash_name] = item
+            self._add_sell_order(item, price, quantity, agent_id)
+
+    def _add_buy_order(self, item: MarketItem, price: int, quantity: int, agent_id: AgentID):
+        order = Order(OrderType.BUY, item, price, quantity, agent_id, self.current_step)
+        market_hash_name = item.market_hash_name
+
+        book = self.buy_orders.get(market_hash_name)
+        if book is None:
+            book = self.buy_orders[market_hash_name] = SortedList(key=_buy_book_key)
+        book.add(order)
+
+        self.agent_buy_orders_idx[agent_id][market_hash_name] = order.id
+        self._orders_by_agent[agent_id][order.id] = order
+        self._orders_by_id[order.id] = order
+
+    def _add_sell_order(self, item: MarketItem, price: int, quantity: int, agent_id: AgentID):
+        order = Order(OrderType.SELL, item, price, quantity, agent_id, self.current_step)
+        market_hash_name = item.market_hash_name
+
+        book = self.sell_orders.get(market_hash_name)
+        if book is None:
+            book = self.sell_orders[market_hash_name] = SortedList(key=_sell_book_key)
+        book.add(order)
+
+        self.items_map[market_hash_name] = item
+        self._items_with_asks[market_hash_name] = None
+        self._invalidate_available_items()
+        self._orders_by_agent[agent_id][order.id] = order
+        self._orders_by_id[order.id] = order
 
     def cancel_buy_order(self, market_hash_name: MarketHashName, order_id: OrderID) -> None:
         """Cancel Buy Order for given item"""
-        orders = self.buy_orders[market_hash_name]
-        for order in orders:
-            if order.id == order_id:
-                self._remove_buy_order(order=order)
-                return
-        raise NoOrderMatch("Buy Order doesn't exist.")
+        order = self._orders_by_id.get(order_id)
+        if (
+            order is None
+            or order.type != OrderType.BUY
+            or order.item.market_hash_name != market_hash_name
+        ):
+            raise NoOrderMatch("Buy Order doesn't exist.")
+        self._remove_buy_order(order=order)
     
     def _remove_buy_order(self, order: Order):
         """
@@ -228,58 +428,98 @@ class Market:
 
         agent_id = order.agent_id
         self.agent_buy_orders_idx[agent_id].pop(market_hash_name, None)
+        self._orders_by_agent[agent_id].pop(order.id, None)
+        self._orders_by_id.pop(order.id, None)
 
         if not self.agent_buy_orders_idx[agent_id]:
             del self.agent_buy_orders_idx[agent_id]
 
     def cancel_sell_order(self, market_hash_name: MarketHashName, order_id: OrderID) -> None:
         """Cancel sell order and return remaining items to Agent's inventory."""
-        orders = self.sell_orders[market_hash_name]
-        for order in orders:
-            if order.id == order_id:
-                self.agents[order.agent_id].add_item(item=order.item, quantity=order.quantity)
-                orders.remove(order)
-                return
-        raise NoOrderMatch("Sell Order doesn't exist.")
-
-    def _get_matching_sell_orders(
+        order = self._orders_by_id.get(order_id)
+        if (
+            order is None
+            or order.type != OrderType.SELL
+            or order.item.market_hash_name != market_hash_name
+        ):
+            raise NoOrderMatch("Sell Order doesn't exist.")
+
+        self.agents[order.agent_id].add_item(item=order.item, quantity=order.quantity)
+        self.sell_orders[market_hash_name].remove(order)
+        self._orders_by_agent[order.agent_id].pop(order.id, None)
+        self._orders_by_id.pop(order.id, None)
+        if not self.sell_orders[market_hash_name]:
+            self._items_with_asks.pop(market_hash_name, None)
+        self._invalidate_available_items()
+
+    def _iter_matching_sell_orders(
             self,
             item: MarketItem,
             price: int,
             exclude_agent_id: AgentID | None = None
-    ) -> list[Order]:
+    ):
         """
-        Fetches Sell Orders for a given Item sorted from lowest to highest price.
+        Lazily yields Sell Orders for a given Item from lowest to highest price.
+
+        Nothing is materialized, so an early break (e.g. once the desired
+        quantity is filled) skips the rest of the book entirely. Callers must
+        not remove orders from the book while iterating.
 
         Optional: Excludes orders created by a specific agent preventing self-trading.
         """
-        sell_orders = self.sell_orders[item.market_hash_name]
-        dummy = Order(type=OrderType.SELL, item=item, price=price, quantity=0, agent_id=AgentID(-1), step=100_000_000)
-        idx = sell_orders.bisect_right(dummy)
-        return [
-            order for order in sell_orders[:idx]
-            if exclude_agent_id is None or order.agent_id != exclude_agent_id
-        ]
-
-    def _get_matching_buy_orders(
+        market_hash_name = item.market_hash_name
+        sell_orders = self.sell_orders.get(market_hash_name)
+        if not sell_orders:
+            return
+
+        # Drop the per-candidate predicate when the agent has no ask on this
+        # item, which is the common case for a buyer
+        if exclude_agent_id is not None and not any(
+            order.type is OrderType.SELL and order.item.market_hash_name == market_hash_name
+            for order in self._orders_by_agent.get(exclude_agent_id, {}).values()
+        ):
+            exclude_agent_id = None
+
+        if exclude_agent_id is None:
+            yield from sell_orders.irange_key(max_key=(price, float('inf')))
+            return
+        for order in sell_orders.irange_key(max_key=(price, float('inf'))):
+            if order.agent_id != exclude_agent_id:
+                yield order
+
+    def _iter_matching_buy_orders(
             self,
             item: MarketItem,
             price: int,
-            exclude_agent_id: int | None = None
-    ) -> list[Order]:
+            exclude_agent_id: AgentID | None = None
+    ):
         """
-        Fetches Buy Orders for a given Item sorted from earliest to latest by current_step.
+        Lazily yields Buy Orders for a given Item in price-time priority:
+        highest price first, earliest step first within a price level.
+
+        Callers must not remove orders from the book while iterating.
 
         Optional: Excludes orders created by a specific agent preventing self-trading.
         """
-        buy_orders = self.buy_orders[item.market_hash_name]
-        dummy = Order(type=OrderType.BUY, item=item, price=price, quantity=0, agent_id=AgentID(-1), step=100_000_000)
-        idx = buy_orders.bisect_left(dummy)
-        matching_orders = [
-            order for order in buy_orders[:idx]
-            if exclude_agent_id is None or order.agent_id != exclude_agent_id
-        ]
-        return sorted(matching_orders, key=lambda o: o.step)
+        market_hash_name = item.market_hash_name
+        buy_orders = self.buy_orders.get(market_hash_name)
+        if not buy_orders:
+            return
+
+        # One buy order per (agent, item), so the self-trade check is a
+        # single index lookup instead of a per-candidate predicate
+        if (
+            exclude_agent_id is not None
+            and market_hash_name not in self.agent_buy_orders_idx.get(exclude_agent_id, {})
+        ):
+            exclude_agent_id = None
+
+        if exclude_agent_id is None:
+            yield from buy_orders.irange_key(max_key=(-price, float('inf')))
+            return
+        for order in buy_orders.irange_key(max_key=(-price, float('inf'))):
+            if order.agent_id != exclude_agent_id:
+                yield order
 
     def add_sale(
             self,
@@ -300,6 +540,7 @@ class Market:
             step=self.current_step
         )
         self.sales_history[item.market_hash_name].append(sale)
+        self._price_windows[item.market_hash_name].push(price)
         self.agent_purchases[buyer_id].append(sale)
         self.agent_sales[seller_id].append(sale)
 
@@ -329,73 +570,103 @@ class Market:
             raise AgentDoesNotExist(f"Buyer Agent {buyer_id} not found.")
 
         # Check for existing BuyOrder and return its ID
-        order_id = self._get_existing_buy_order_id(agent_id=buyer_id, market_hash_name=market_hash_name)
+        order_id = self.has_active_buy_order(agent_id=buyer_id, market_hash_name=market_hash_name)
         if order_id:
             raise DuplicateBuyOrder(f"Agent can place only one Buy Order on the item!", order_id)
 
         if buyer.balance < price * quantity:
             raise InsufficientBalance("Agent doesn't have enough balance for this Order!")
 
-        matching_sell_orders = self._get_matching_sell_orders(
+        matching_sell_orders = self._iter_matching_sell_orders(
             item=item,
             price=price,
             exclude_agent_id=buyer_id
         )
         remaining_quantity = quantity
+        filled_sell_orders: list[Order] = []
+
+        # Balance deltas are accumulated across fills and applied once after
+        # the loop; the max-balance cap reads pending credits from the dict
+        buyer_spent = 0
+        seller_credits: dict[AgentID, int] = {}
+
+        # Hoisted out of the fill loop: constant for the whole call
+        agents = self.agents
+        unlock_step = self.calculate_unlock_step(is_trade_lock=self.lock_on_purchase)
+        step = self.current_step
+        sales_list = self.sales_history[market_hash_name]
+        price_window = self._price_windows[market_hash_name]
+        buyer_purchases = self.agent_purchases[buyer_id]
 
         for sell_order in matching_sell_orders:
             if remaining_quantity == 0:
                 break
 
-            trade_quantity = min(sell_order.quantity, remaining_quantity)
+            order_quantity = sell_order.quantity
+            trade_quantity = order_quantity if order_quantity < remaining_quantity else remaining_quantity
 
-            seller = self.agents.get(sell_order.agent_id)
+            seller_id = sell_order.agent_id
+            seller = agents.get(seller_id)
             if not seller:
                 raise AgentDoesNotExist("Agent not found")
-            
+
             # Ensure this sale doesn't exceed seller max allowed balance
             # if True pick maximum allowed quantity for this sale
             sell_price = sell_order.price   # attr look-up optimization
+            pending_credit = seller_credits.get(seller_id, 0)
             trade_quantity = self._max_receivable_quantity(
-                seller_balance=seller.balance,
+                seller_balance=seller.balance + pending_credit,
                 price=sell_price,
                 desired_qty=trade_quantity
             )
             if trade_quantity == 0:
                 continue
-            
+
             order_total = sell_price * trade_quantity
             fee = self.calculate_fee(order_total)
 
             # Add up money to the seller and subtract from buyer
-            seller.balance += order_total - fee
-            buyer.balance -= order_total
+            seller_credits[seller_id] = pending_credit + order_total - fee
+            buyer_spent += order_total
 
             # Add BOUGHT ITEM to the buyer's inventory
             buyer.add_item(
                 item=sell_order.item,
                 quantity=trade_quantity,
-                unlock_step=self.calculate_unlock_step(is_trade_lock=self.lock_on_purchase)
+                unlock_step=unlock_step
             )
 
-            # Add a BOUGHT ITEM record to sales history
-            self.add_sale(
-                item=sell_order.item,
-                price=sell_price,
-                fee=fee,
-                quantity=trade_quantity,
-                buyer_id=buyer_id,
-                seller_id=sell_order.agent_id
-            )
+            # Add a BOUGHT ITEM record to sales history (inlined add_sale:
+            # the per-item lists are hoisted above the loop)
+            sale = Sale(sell_order.item, sell_price, fee, trade_quantity, buyer_id, seller_id, step)
+            sales_list.append(sale)
+            price_window.push(sell_price)
+            buyer_purchases.append(sale)
+            self.agent_sales[seller_id].append(sale)
 
-            # Update order and remaining quantity
+            # Update order and remaining quantity; removal is deferred because
+            # the book can't be mutated while its iterator is live
             sell_order.quantity -= trade_quantity
             if sell_order.quantity == 0:
-                self.sell_orders[market_hash_name].remove(sell_order)
+                filled_sell_orders.append(sell_order)
             remaining_quantity -= trade_quantity
 
+        if buyer_spent:
+            buyer.balance -= buyer_spent
+        for seller_id, credit in seller_credits.items():
+            agents[seller_id].balance += credit
+
+        for sell_order in filled_sell_orders:
+            self.sell_orders[market_hash_name].remove(sell_order)
+            self._orders_by_agent[sell_order.agent_id].pop(sell_order.id, None)
+            self._orders_by_id.pop(sell_order.id, None)
+        if filled_sell_orders:
+            if not self.sell_orders[market_hash_name]:
+                self._items_with_asks.pop(market_hash_name, None)
+            self._invalidate_available_items()
+
         if remaining_quantity > 0:
-            self.create_order(OrderType.BUY, item, price, remaining_quantity, buyer_id)
+            self._add_buy_order(item, price, remaining_quantity, buyer_id)
 
         return quantity - remaining_quantity
 
@@ -421,74 +692,84 @@ class Market:
             raise AgentDoesNotExist("Seller not found.")
         seller.remove_item(market_hash_name, quantity)
 
-        matching_buy_orders = self._get_matching_buy_orders(
+        matching_buy_orders = self._iter_matching_buy_orders(
             item=item,
             price=sell_price,
             exclude_agent_id=seller_id
         )
         remaining_quantity = quantity
+        closed_buy_orders: list[Order] = []
+
+        # Hoisted out of the fill loop: constant for the whole call
+        agents = self.agents
+        unlock_step = self.calculate_unlock_step(is_trade_lock=self.lock_on_purchase)
+        step = self.current_step
+        sales_list = self.sales_history[market_hash_name]
+        price_window = self._price_windows[market_hash_name]
+        seller_sales = self.agent_sales[seller_id]
+
+        # Seller proceeds accumulate in a local and are written back once
+        seller_balance = seller.balance
 
         for buy_order in matching_buy_orders:
             if remaining_quantity == 0:
                 break
 
-            sell_quantity = min(buy_order.quantity, remaining_quantity)
-            buyer = self._get_agent_by_id(buy_order.agent_id)
+            order_quantity = buy_order.quantity
+            sell_quantity = order_quantity if order_quantity < remaining_quantity else remaining_quantity
+            buyer = agents.get(buy_order.agent_id)
             if not buyer:
                 raise AgentDoesNotExist("Agent not found")
 
             # Check if Buyer can afford this purchase, if not buy as many as possible
             affordable_quantity = buyer.balance // sell_price
             if affordable_quantity == 0:
-                self._remove_buy_order(order=buy_order)
+                closed_buy_orders.append(buy_order)
                 continue    # buyer can't afford this purchase
 
             # Check if Seller can sell these items and not exceed max balance
             trade_quantity = self._max_receivable_quantity(
-                seller_balance=seller.balance,
+                seller_balance=seller_balance,
                 price=sell_price,
-                desired_qty=min(sell_quantity, affordable_quantity)
+                desired_qty=sell_quantity if sell_quantity < affordable_quantity else affordable_quantity
             )
             if trade_quantity == 0:
-                self._remove_buy_order(order=buy_order)
+                closed_buy_orders.append(buy_order)
                 break   # seller exceeded max balance and can't sell items anymore
 
             order_total = sell_price * trade_quantity
             fee = self.calculate_fee(order_total)
 
-            seller.balance += order_total - fee
+            seller_balance += order_total - fee
             buyer.balance -= order_total
 
             # Add item to the buyer inventory
             buyer.add_item(
                 item=item,
                 quantity=trade_quantity,
-                unlock_step=self.calculate_unlock_step(is_trade_lock=self.lock_on_purchase)
+                unlock_step=unlock_step
             )
 
-            # Add sale history
-            self.add_sale(
-                item=item,
-                price=sell_price,
-                fee=fee,
-                quantity=trade_quantity,
-                buyer_id=buyer.id,
-                seller_id=seller_id
-            )
+            # Add sale history (inlined add_sale: per-item lists hoisted above)
+            sale = Sale(item, sell_price, fee, trade_quantity, buyer.id, seller_id, step)
+            sales_list.append(sale)
+            price_window.push(sell_price)
+            self.agent_purchases[buyer.id].append(sale)
+            seller_sales.append(sale)
             
-            # Purchase as many as possible
+            # Purchase as many as possible; removal is deferred because
+            # the book can't be mutated while its iterator is live
             buy_order.quantity -= trade_quantity
             if buy_order.quantity == 0:
-                self._remove_buy_order(buy_order)
+                closed_buy_orders.append(buy_order)
 
             remaining_quantity -= trade_quantity
 
+        seller.balance = seller_balance
+
+        for buy_order in closed_buy_orders:
+            self._remove_buy_order(buy_order)
+
         # list unsold items, create sell order with remaining amount
         if remaining_quantity > 0:
-            self.create_order(
-                order_type=OrderType.SELL,
-                item=item,
-                price=sell_price,
-                quantity=remaining_quantity,
-                agent_id=seller_id
-            )
+            self._add_sell_order(item, sell_price, remaining_quantity, seller_id)
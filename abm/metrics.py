@@ -2,11 +2,17 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 from statistics import median
+from bisect import bisect_left
+from collections import deque
+
+import numpy as np
+from sortedcontainers import SortedList
 
 from .constants import ONE_DOLLAR
 from .models import (
     MarketHashName,
-    SalesHistory
+    SalesHistory,
+    SalesSummary
 )
 
 
@@ -30,6 +36,125 @@ def calculate_median_price(
     return round(median([sale.price for sale in item_sales[-number_of_sales:]]))
 
 
+class RollingPriceWindow:
+    """
+    Incrementally maintained statistics over the last ``size`` sale prices.
+
+    Each trade updates half-sums (for trend analysis) and monotonic min/max
+    deques in O(1) amortized, so per-item trend, spread and average queries
+    need no rescan of the sales history.
+    """
+    __slots__ = (
+        "size",
+        "_first",
+        "_second",
+        "_sum_first",
+        "_sum_second",
+        "_min_q",
+        "_max_q",
+        "_sorted",
+        "_seq",
+    )
+
+    def __init__(self, size: int):
+        if size <= 0:
+            raise ValueError("Window size must be positive")
+        self.size = size
+
+        # Oldest n//2 prices and the newest n - n//2 prices of the window
+        self._first: deque[int] = deque()
+        self._second: deque[int] = deque()
+        self._sum_first = 0
+        self._sum_second = 0
+
+        # Monotonic deques of (arrival index, price) for O(1) min/max
+        self._min_q: deque[tuple[int, int]] = deque()
+        self._max_q: deque[tuple[int, int]] = deque()
+
+        # Order statistics over the window for O(1) median reads
+        self._sorted: SortedList[int] = SortedList()
+        self._seq = 0
+
+    @property
+    def count(self) -> int:
+        return len(self._first) + len(self._second)
+
+    def push(self, price: int):
+        self._seq += 1
+        self._second.append(price)
+        self._sum_second += price
+        self._sorted.add(price)
+
+        if self.count > self.size:
+            evicted = self._first.popleft()
+            self._sum_first -= evicted
+            self._sorted.remove(evicted)
+
+        # Keep the halves split at count // 2 (oldest half first)
+        while len(self._first) < self.count // 2:
+            moved = self._second.popleft()
+            self._sum_second -= moved
+            self._first.append(moved)
+            self._sum_first += moved
+
+        oldest_seq = self._seq - self.size + 1
+        while self._min_q and self._min_q[0][0] < oldest_seq:
+            self._min_q.popleft()
+        while self._max_q and self._max_q[0][0] < oldest_seq:
+            self._max_q.popleft()
+        while self._min_q and self._min_q[-1][1] >= price:
+            self._min_q.pop()
+        while self._max_q and self._max_q[-1][1] <= price:
+            self._max_q.pop()
+        self._min_q.append((self._seq, price))
+        self._max_q.append((self._seq, price))
+
+    @property
+    def avg_first(self) -> float:
+        return self._sum_first / len(self._first) if self._first else float('nan')
+
+    @property
+    def avg_second(self) -> float:
+        return self._sum_second / len(self._second) if self._second else float('nan')
+
+    @property
+    def avg(self) -> float:
+        return (self._sum_first + self._sum_second) / self.count if self.count else float('nan')
+
+    @property
+    def median(self) -> int:
+        """Median price over the window, matching statistics.median + round."""
+        n = self.count
+        if n % 2:
+            return self._sorted[n // 2]
+        return round((self._sorted[n // 2 - 1] + self._sorted[n // 2]) / 2)
+
+    @property
+    def min(self) -> int:
+        return self._min_q[0][1]
+
+    @property
+    def max(self) -> int:
+        return self._max_q[0][1]
+
+
+def analyze_prices(prices: np.ndarray) -> tuple[float, float, int, int, float]:
+    """
+    Computes price-series statistics for trend/spread analysis in one vectorized pass.
+
+    :returns: Tuple of (avg_first, avg_second, min_price, max_price, avg_price),
+        where avg_first/avg_second are means of the first and second halves of the series.
+    """
+    mid = len(prices) // 2
+    return (
+        float(prices[:mid].mean()),
+        float(prices[mid:].mean()),
+        int(prices.min()),
+        int(prices.max()),
+        float(prices.mean()),
+    )
+
+
 def calculate_weighted_mean_price(
         sales_history: SalesHistory,
         market_hash_name: MarketHashName,
@@ -41,15 +166,19 @@ def calculate_weighted_mean_price(
         return 0.0
 
     recent_sales = item_sales[-number_of_sales:]
-    total_qty = sum(sale.quantity for sale in recent_sales)
-    weighted_sum = sum(sale.price * sale.quantity for sale in recent_sales)
+    count = len(recent_sales)
+    prices = np.fromiter((sale.price for sale in recent_sales), np.int64, count)
+    quantities = np.fromiter((sale.quantity for sale in recent_sales), np.int64, count)
 
-    return (weighted_sum / total_qty) / ONE_DOLLAR
+    return (int(prices @ quantities) / int(quantities.sum())) / ONE_DOLLAR
 
 
 def calculate_total_fee(sales_history: SalesHistory) -> float:
     """Returns total fee earned for all sales (in monetary units)."""
-    return sum(sale.total_fee for history in sales_history.values() for sale in history) / ONE_DOLLAR
+    total = 0
+    for history in sales_history.values():
+        total += int(np.fromiter((sale.total_fee for sale in history), np.int64, len(history)).sum())
+    return total / ONE_DOLLAR
 
 
 def calculate_sales_volume(
@@ -74,7 +203,9 @@ def calculate_sales_volume(
     if not item_sales:
         return 0
 
-    latest_step = max(sale.step for sale in item_sales)
+    # Sales are appended in step order, so the newest step is just the tail
+    # and the window boundary can be bisected instead of mask-filtered
+    latest_step = item_sales[-1].step
 
     if period == "day":
         time_threshold = latest_step - steps_per_day
@@ -85,11 +216,42 @@ def calculate_sales_volume(
     else:
         raise ValueError("Wrong time period! Please use 'day', 'week' or 'month'.")
 
-    return sum(
-        sale.quantity
-        for sale in item_sales
-        if sale.step >= time_threshold
-    )
+    first_in_window = bisect_left(item_sales, time_threshold, key=lambda sale: sale.step)
+
+    return sum(sale.quantity for sale in item_sales[first_in_window:])
+
+
+def summarize_sales(sales_history: SalesHistory, market_hash_name: MarketHashName) -> SalesSummary:
+    """
+    Builds the end-of-run report in a single traversal of the sales history.
+
+    Replaces the get_all_sales + calculate_weighted_mean_price +
+    calculate_total_fee sequence, which walked the full history three times.
+
+    :param sales_history: List with records of all past sales
+    :param market_hash_name: Item whose weighted mean price to report
+
+    :returns: SalesSummary with the total sale count, the item's weighted
+        mean price and the total fee earned (both in monetary units)
+    """
+    total_sales = 0
+    total_fee = 0
+    weighted_sum = 0
+    total_quantity = 0
+
+    for name, history in sales_history.items():
+        count = len(history)
+        total_sales += count
+        total_fee += int(np.fromiter((sale.total_fee for sale in history), np.int64, count).sum())
+
+        if name == market_hash_name:
+            prices = np.fromiter((sale.price for sale in history), np.int64, count)
+            quantities = np.fromiter((sale.quantity for sale in history), np.int64, count)
+            weighted_sum = int(prices @ quantities)
+            total_quantity = int(quantities.sum())
+
+    avg_price = (weighted_sum / total_quantity) / ONE_DOLLAR if total_quantity else 0.0
+    return SalesSummary(total_sales, avg_price, total_fee / ONE_DOLLAR)
 
 
 def get_all_sales(sales_history: SalesHistory):
@@ -1,3 +1,4 @@
+import sys
 import random
 import itertools
 
@@ -87,7 +88,9 @@ class MarketItem(ABC):
     market_hash_name: MarketHashName = field(init=False)
 
     def __post_init__(self):
-        object.__setattr__(self, 'market_hash_name', self.name)
+        # Interned: the name keys every hot-path dict (books, history,
+        # price windows), so hashing can short-circuit on identity
+        object.__setattr__(self, 'market_hash_name', sys.intern(self.name))
 
 
 @dataclass(frozen=True, slots=True)
@@ -205,7 +208,7 @@ class WeaponSkin(MarketItem):
     
     def __post_init__(self):
         MarketItem.__post_init__(self)
-        object.__setattr__(self, 'market_hash_name', f"{self.name} ({self.exterior.value})")
+        object.__setattr__(self, 'market_hash_name', sys.intern(f"{self.name} ({self.exterior.value})"))
 
 
 @dataclass(slots=True)
@@ -247,11 +250,37 @@ SalesHistory: TypeAlias = DefaultDict[MarketHashName, list[Sale]]
 AgentMarketHistory: TypeAlias = DefaultDict[AgentID, list[Sale]]
 AgentBuyOrderIndex: TypeAlias = dict[AgentID, dict[MarketHashName, OrderID]]
 
+@dataclass(slots=True, frozen=True)
+class ItemPriceStats:
+    """
+    Per-item analytics snapshot cached by the Market for one simulation step.
+
+    Derived from the recent sales window and the current order book, so every
+    Agent acting on the same step can reuse one computation.
+    """
+    num_sales: int
+    avg_first: float
+    avg_second: float
+    min_price: int
+    max_price: int
+    avg_price: float
+    trend_up: bool
+    spread: float
+    best_bid: int | None
+    best_ask: int | None
+
 @dataclass(slots=True)
 class EntryPrice:
     avg_price: int
     quantity: int
 
+@dataclass(slots=True, frozen=True)
+class SalesSummary:
+    """End-of-run aggregate over the whole sales history, built in one pass."""
+    total_sales: int
+    avg_price: float
+    total_fee: float
+
 @dataclass(slots=True, frozen=True)
 class ActiveAgentsResult:
     count: int
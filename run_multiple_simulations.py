@@ -5,92 +5,36 @@ import numpy as np
 import pandas as pd
 
 from typing import Any
-from random import Random
 from statistics import mean, stdev
-from multiprocessing import Pool
-
-from abm import Market, DropGenerator, Agent, AgentType, NoviceAgent, TraderAgent, InvestorAgent, FarmerAgent
-from abm.metrics import calculate_weighted_mean_price, get_all_sales, calculate_total_fee
-from abm.models import AgentID, MarketItem, Container, ItemCategory, ItemRarity
+from multiprocessing import Pool, cpu_count
+
+from abm import Market, DropGenerator
+from abm.metrics import summarize_sales
+from simulation_setup import (
+    STEPS_PER_DAY,
+    TRADE_LOCK_PERIOD,
+    LOCK_ON_PURCHASE,
+    MAX_WALLET_BALANCE,
+    NUMBER_OF_AGENTS,
+    NUMBER_OF_STEPS,
+    BASE_DROP_CHANCE,
+    MAX_DROPS_PER_WEEK,
+    TRADE_LOCK_ON,
+    AGENT_WEIGHTS,
+    ITEMS_DICT,
+    generate_agents
+)
 
 MARKET_FEES = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
 NUMBER_OF_SIMULATIONS = 100
-STEPS_PER_DAY = 1000
-TRADE_LOCK_PERIOD = 7
-LOCK_ON_PURCHASE = True
-MAX_WALLET_BALANCE = 10000
-
-NUMBER_OF_AGENTS = 2000
-NUMBER_OF_STEPS = 150_000
-
-MIN_BALANCE = 0
-MAX_BALANCE = 2000
-MEAN_BALANCE = 650
-STD_DEV_BALANCE = 300
-
-MIN_NUMBER_OF_ACCOUNTS = 1
-MAX_NUMBER_OF_ACCOUNTS = 1000
-MEAN_NUMBER_OF_ACCOUNTS = 100
-STD_DEV_ACCOUNT_NUMBERS = 50
-
-BASE_DROP_CHANCE = 0.6
-MAX_DROPS_PER_WEEK = 1
-TRADE_LOCK_ON = True
-
-AGENT_WEIGHTS = {
-    AgentType.NOVICE: 0.4,
-    AgentType.TRADER: 0.2,
-    AgentType.INVESTOR: 0.3,
-    AgentType.FARMER: 0.1,
-}
-
-ITEMS_DICT: dict[MarketItem, float] = {
-    Container('Prisma Case', ItemRarity.BASE_GRADE, ItemCategory.CONTAINER): 1.0
-}
-
-
-def generate_agents(
-        market: Market,
-        rng: Random, 
-        np_rng: np.random.Generator, 
-        num_agents: int, 
-        weights: dict[AgentType, float]
-) -> list[Agent]:
-    types, probs = zip(*weights.items())
-
-    balances = np_rng.normal(MEAN_BALANCE, STD_DEV_BALANCE, num_agents)
-    balances = np.clip(balances, MIN_BALANCE, MAX_BALANCE)
-
-    farm_sizes = np_rng.normal(MEAN_NUMBER_OF_ACCOUNTS, STD_DEV_ACCOUNT_NUMBERS, num_agents)
-    farm_sizes = np.clip(
-        np.round(farm_sizes), MIN_NUMBER_OF_ACCOUNTS, MAX_NUMBER_OF_ACCOUNTS
-    ).astype(int)
-
-    agents: list[Agent] = []
-    for i in range(num_agents):
-        agent_id = AgentID(i)
-        agent_type = rng.choices(types, weights=probs, k=1)[0]
-        balance = int(balances[i] * 100)
-        impulsivity = rng.random()
-
-        if agent_type == AgentType.NOVICE:
-            agent = NoviceAgent(agent_id, market, agent_type, balance, impulsivity)
-        elif agent_type == AgentType.TRADER:
-            risk_tolerance = rng.random()
-            agent = TraderAgent(agent_id, market, agent_type, balance, impulsivity, risk_tolerance)
-        elif agent_type == AgentType.INVESTOR:
-            risk_tolerance = rng.random()
-            agent = InvestorAgent(agent_id, market, agent_type, balance, impulsivity, risk_tolerance)
-        else:
-            number_of_accounts = int(farm_sizes[i])
-            agent = FarmerAgent(agent_id, market, agent_type, balance, impulsivity, number_of_accounts)
-
-        agents.append(agent)
-    return agents
 
 
 def run_single_simulation(market_fee: float, steps: int = 100_000, seed: int | None = None):
-    rng = random.Random(seed)
+    # Agents draw from the module-level random and legacy np.random; seed
+    # both per task so runs stay reproducible now that the scheduler uses
+    # the local NumPy generator
+    random.seed(seed)
+    np.random.seed(seed)
     np_rng = np.random.default_rng(seed)
 
     market = Market(
@@ -100,7 +44,7 @@ def run_single_simulation(market_fee: float, steps: int = 100_000, seed: int | N
         lock_on_purchase=LOCK_ON_PURCHASE,
         max_balance=MAX_WALLET_BALANCE
     )
-    agents = generate_agents(market, rng, np_rng, num_agents=NUMBER_OF_AGENTS, weights=AGENT_WEIGHTS)
+    agents = generate_agents(market, NUMBER_OF_AGENTS, AGENT_WEIGHTS, np_rng)
     market.add_agents(agents)
 
     drop_generator = DropGenerator(
@@ -112,21 +56,23 @@ def run_single_simulation(market_fee: float, steps: int = 100_000, seed: int | N
         trade_lock_on=TRADE_LOCK_ON
     )
 
+    # Pre-drawn schedule and bound-method table: the inner loop does one
+    # array read and one call instead of rng.choice + attribute lookup
+    schedule = np_rng.integers(0, len(agents), size=steps)
+    act_fns = [agent.act for agent in agents]
+
     for step in range(steps):
         market.current_step = step
         drop_generator.tick(step)
+        act_fns[schedule[step]]()
 
-        agent = rng.choice(agents)
-        agent.act()
-
-    total_sales = len(get_all_sales(market.sales_history))
-    avg_price = calculate_weighted_mean_price(market.sales_history, 'Prisma Case', number_of_sales=total_sales)
+    summary = summarize_sales(market.sales_history, 'Prisma Case')
     print("SIMULATION FINISHED!")
     result: dict[str, Any] = {
         'fee': market_fee,
-        'total_sales': total_sales,
-        'avg_price': avg_price,
-        'total_fee': calculate_total_fee(market.sales_history)
+        'total_sales': summary.total_sales,
+        'avg_price': summary.avg_price,
+        'total_fee': summary.total_fee
     }
 
     gc.collect()
@@ -144,12 +90,15 @@ def main():
         for fee in MARKET_FEES
         for i in range(NUMBER_OF_SIMULATIONS)
     ]
-    with Pool(processes=10) as pool:
-        results = pool.map(worker, tasks)
+    # imap_unordered with a real chunksize: workers pull batches of tasks
+    # instead of contending on the queue per task, and results are consumed
+    # as they arrive rather than buffered until the whole map finishes
+    chunksize = max(1, len(tasks) // ((cpu_count() or 1) * 4))
 
-    results_by_fee = {}
-    for (fee, _), res in zip(tasks, results):
-        results_by_fee.setdefault(fee, []).append(res)
+    results_by_fee: dict[float, list[dict[str, Any]]] = {}
+    with Pool(processes=10) as pool:
+        for res in pool.imap_unordered(worker, tasks, chunksize=chunksize):
+            results_by_fee.setdefault(res['fee'], []).append(res)
     summary = []
     for fee in MARKET_FEES:
         batch = results_by_fee.get(fee, [])
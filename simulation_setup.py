@@ -0,0 +1,130 @@
+"""
+Shared configuration and population setup for the simulation entry points.
+
+run_simulation.py and run_multiple_simulations.py used to carry their own
+copies of these constants and of generate_agents; they now import this module
+so the population model lives in one place.
+"""
+import numpy as np
+
+from abm import (
+    Agent,
+    Market,
+    AgentType,
+    NoviceAgent,
+    TraderAgent,
+    InvestorAgent,
+    FarmerAgent
+)
+from abm.models import (
+    AgentID,
+    Container,
+    ItemCategory,
+    ItemRarity,
+    MarketItem
+)
+
+STEPS_PER_DAY = 1000
+TRADE_LOCK_PERIOD = 7
+LOCK_ON_PURCHASE = True
+MAX_WALLET_BALANCE = 10000
+
+NUMBER_OF_AGENTS = 2000
+NUMBER_OF_STEPS = 150_000
+
+MIN_BALANCE = 0
+MAX_BALANCE = 2000
+MEAN_BALANCE = 650
+STD_DEV_BALANCE = 300
+
+MIN_NUMBER_OF_ACCOUNTS = 1
+MAX_NUMBER_OF_ACCOUNTS = 1000
+MEAN_NUMBER_OF_ACCOUNTS = 100
+STD_DEV_ACCOUNT_NUMBERS = 50
+
+BASE_DROP_CHANCE = 0.6
+MAX_DROPS_PER_WEEK = 1
+TRADE_LOCK_ON = True
+
+AGENT_WEIGHTS = {
+    AgentType.NOVICE: 0.4,
+    AgentType.TRADER: 0.2,
+    AgentType.INVESTOR: 0.3,
+    AgentType.FARMER: 0.1,
+}
+
+# Unpacked once at import; every generate_agents call with the default
+# weights reuses these instead of rebuilding tuples and a prob array
+_AGENT_TYPES = tuple(AGENT_WEIGHTS)
+_AGENT_PROBS = np.array(list(AGENT_WEIGHTS.values()), dtype=np.float64)
+
+ITEMS_DICT: dict[MarketItem, float] = {
+    Container('Prisma Case', ItemRarity.BASE_GRADE, ItemCategory.CONTAINER): 1.0
+}
+
+
+def generate_agents(
+        market: Market,
+        num_agents: int,
+        weights: dict[AgentType, float],
+        np_rng: np.random.Generator | None = None
+) -> list[Agent]:
+    if weights is AGENT_WEIGHTS:
+        types, probs = _AGENT_TYPES, _AGENT_PROBS
+    else:
+        types = tuple(weights)
+        probs = np.fromiter(weights.values(), np.float64, len(weights))
+    if np_rng is None:
+        np_rng = np.random.default_rng()
+
+    balances = np_rng.normal(MEAN_BALANCE, STD_DEV_BALANCE, num_agents)
+    balances = np.clip(balances, MIN_BALANCE, MAX_BALANCE)
+
+    farm_sizes = np_rng.normal(MEAN_NUMBER_OF_ACCOUNTS, STD_DEV_ACCOUNT_NUMBERS, num_agents)
+    farm_sizes = np.clip(
+        np.round(farm_sizes), MIN_NUMBER_OF_ACCOUNTS, MAX_NUMBER_OF_ACCOUNTS
+    ).astype(int)
+
+    # All random attributes are drawn as whole arrays up front instead of
+    # per-agent choices/random calls inside the loop
+    type_indices = np_rng.choice(len(types), size=num_agents, p=probs)
+
+    # Converted to native Python values once; indexing an ndarray in the
+    # construction loops would box a NumPy scalar per access
+    impulsivities = np_rng.random(num_agents).tolist()
+    risk_tolerances = np_rng.random(num_agents).tolist()
+    balances_cents = (balances * 100).astype(np.int64).tolist()
+    farm_sizes = farm_sizes.tolist()
+
+    # Agents are constructed grouped by type, one tight loop per subclass,
+    # instead of re-branching on the type for every agent. Each agent keeps
+    # id == its position in the list.
+    agents: list[Agent] = [None] * num_agents   # type: ignore[list-item]
+    for type_index, agent_type in enumerate(types):
+        member_ids = np.nonzero(type_indices == type_index)[0].tolist()
+
+        if agent_type == AgentType.NOVICE:
+            for i in member_ids:
+                agents[i] = NoviceAgent(
+                    AgentID(i), market, agent_type, balances_cents[i], impulsivities[i]
+                )
+        elif agent_type == AgentType.TRADER:
+            for i in member_ids:
+                agents[i] = TraderAgent(
+                    AgentID(i), market, agent_type, balances_cents[i],
+                    impulsivities[i], risk_tolerances[i]
+                )
+        elif agent_type == AgentType.INVESTOR:
+            for i in member_ids:
+                agents[i] = InvestorAgent(
+                    AgentID(i), market, agent_type, balances_cents[i],
+                    impulsivities[i], risk_tolerances[i]
+                )
+        else:
+            for i in member_ids:
+                agents[i] = FarmerAgent(
+                    AgentID(i), market, agent_type, balances_cents[i],
+                    impulsivities[i], farm_sizes[i]
+                )
+
+    return agents
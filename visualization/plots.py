@@ -5,7 +5,10 @@ from collections import defaultdict
 
 from abm import AgentType, Agent, Market
 from abm.constants import ONE_DOLLAR
-from abm.models import AgentID, MarketHashName, SalesHistory
+from abm.models import AgentID, MarketHashName, OrderType, SalesHistory
+
+# Dollar conversion as a multiply: cheaper than a float divide per element
+_INV_ONE_DOLLAR = 1.0 / ONE_DOLLAR
 
 
 AGENT_COLORS = {
@@ -23,16 +26,17 @@ def agent_balance_histogram(agents: list[Agent], bin_width: int = 100):
     :param agents: List of Agent instances.
     :param bin_width: Width of each bin, by default in hundreds.
     """
-    balances = [agent.balance / ONE_DOLLAR for agent in agents]
-    bin_edges = np.arange(0, int(max(balances) // bin_width + 2) * bin_width, bin_width)
+    balances = np.fromiter((agent.balance for agent in agents), np.int64, len(agents)) * _INV_ONE_DOLLAR
+    bin_edges = np.arange(0, int(balances.max() // bin_width + 2) * bin_width, bin_width)
 
-    plt.figure(figsize=(8, 4))
+    fig = plt.figure(figsize=(8, 4))
     plt.hist(balances, bins=bin_edges, color="tab:blue", edgecolor="black", alpha=0.7)
     plt.xlabel("Agent Balances")
     plt.ylabel("Number of Agents")
     plt.title("Distribution of Agent Balances")
     plt.tight_layout()
     plt.show()
+    plt.close(fig)
 
 
 def plot_sales_history(
@@ -41,7 +45,8 @@ def plot_sales_history(
         steps_per_day: int = 1000,
         show_volume: bool = False,
         agents: dict[AgentID, Agent] | None = None,
-        group_by_agent_type: bool = False
+        group_by_agent_type: bool = False,
+        max_points: int = 5000
 ):
     """
     Plots sales history. If show_volume equal True, adds vertical bars of daily sold volume.
@@ -52,6 +57,8 @@ def plot_sales_history(
     :param show_volume: If True, add histogram with sold quantity per day
     :param agents: Dict of AgentID and Agent instance from the Market
     :param group_by_agent_type: If True, shows sales volume grouped by Agent types.
+    :param max_points: Cap on points drawn for the price line; longer histories
+        are thinned evenly before plotting. Pass 0 to draw every sale.
     """
     item_sales = sales_history.get(market_hash_name, [])
     if not item_sales:
@@ -60,33 +67,45 @@ def plot_sales_history(
     if group_by_agent_type:
         show_volume = True
 
-    steps = np.array([sale.step for sale in item_sales])
-    prices = np.array([sale.price for sale in item_sales]) / ONE_DOLLAR
-    quantities = np.array([sale.quantity for sale in item_sales])
-
-    sort_indices = np.argsort(steps)
-    steps = steps[sort_indices]
-    prices = prices[sort_indices]
-    quantities = quantities[sort_indices]
+    # Sales are recorded in step order, so the extracted arrays are already
+    # sorted and no argsort pass is needed
+    count = len(item_sales)
+    steps = np.fromiter((sale.step for sale in item_sales), np.int64, count)
+    prices = np.fromiter((sale.price for sale in item_sales), np.int64, count) * _INV_ONE_DOLLAR
+    quantities = np.fromiter((sale.quantity for sale in item_sales), np.int64, count)
+
+    # Beyond a few thousand segments the line is sub-pixel anyway; thin it
+    # evenly so rendering stays fast on long runs. Volume bars are already
+    # aggregated by day and keep using the full arrays.
+    if max_points and count > max_points:
+        idx = np.linspace(0, count - 1, max_points).astype(np.int64)
+        line_steps = steps[idx]
+        line_prices = prices[idx]
+    else:
+        line_steps = steps
+        line_prices = prices
 
     grid_kwargs = {"color": "#dddddd", "linestyle": "--", "linewidth": 0.5, "alpha": 0.7}
 
     if not show_volume:
         fig, ax = plt.subplots(figsize=(10, 4))
-        ax.plot(steps, prices, color="tab:blue", linewidth=1.0)
+        ax.plot(line_steps, line_prices, color="tab:blue", linewidth=1.0)
         ax.set_xlabel("Simulation Step")
         ax.set_ylabel("Price")
         ax.set_title(f"Sales History: {market_hash_name}")
         ax.grid(**grid_kwargs)
         plt.tight_layout()
         plt.show()
+        plt.close(fig)
         return
 
+    # days is non-decreasing (sales are in step order), so each day is a
+    # contiguous run and group sums reduce over run starts
     days = steps // steps_per_day
-    unique_days, day_indices = np.unique(days, return_inverse=True)
+    unique_days, day_starts = np.unique(days, return_index=True)
 
     fig, ax_price = plt.subplots(figsize=(10, 5))
-    ax_price.plot(steps, prices, color="tab:blue", linewidth=1.0, label="Price")
+    ax_price.plot(line_steps, line_prices, color="tab:blue", linewidth=1.0, label="Price")
     ax_price.set_xlabel("Simulation Step")
     ax_price.set_ylabel("Price", color="tab:blue")
     ax_price.tick_params(axis="y", labelcolor="tab:blue")
@@ -99,7 +118,7 @@ def plot_sales_history(
     bar_width = steps_per_day * 0.9
 
     if not group_by_agent_type:
-        volume_by_day = np.bincount(day_indices, weights=quantities)
+        volume_by_day = np.add.reduceat(quantities, day_starts)
         ax_vol.bar(
             x_positions,
             volume_by_day,
@@ -149,6 +168,7 @@ def plot_sales_history(
 
     plt.tight_layout()
     plt.show()
+    plt.close(fig)
 
 
 def plot_order_book(market: Market, market_hash_name: MarketHashName):
@@ -158,35 +178,20 @@ def plot_order_book(market: Market, market_hash_name: MarketHashName):
     :param market: 'Market' instance, where Buy/Sell orders are stored.
     :param market_hash_name: Market name of the Item.
     """
-    buy_list = market.buy_orders.get(market_hash_name, [])
-    sell_list = market.sell_orders.get(market_hash_name, [])
+    # The book arrays come back in book order (buys: best bid first, sells:
+    # best ask first), so no re-sort is needed before the cumulative sums
+    buy_prices, buy_qtys = market.get_book_arrays(market_hash_name, OrderType.BUY)
+    sell_prices, sell_qtys = market.get_book_arrays(market_hash_name, OrderType.SELL)
 
-    if (not buy_list) and (not sell_list):
+    if buy_prices.size == 0 and sell_prices.size == 0:
         print(f"No buy or sell orders found for item '{market_hash_name}'.")
         return
 
-    if buy_list:
-        buy_prices = np.array([o.price for o in buy_list]) / ONE_DOLLAR
-        buy_qtys = np.array([o.quantity for o in buy_list])
+    buy_prices_sorted = buy_prices * _INV_ONE_DOLLAR
+    buy_cumulative = np.cumsum(buy_qtys)
 
-        idx_buy = np.argsort(-buy_prices)
-        buy_prices_sorted = buy_prices[idx_buy]
-        buy_qtys_sorted = buy_qtys[idx_buy]
-        buy_cumulative = np.cumsum(buy_qtys_sorted)
-    else:
-        buy_prices_sorted = np.array([])
-        buy_cumulative = np.array([])
-
-    if sell_list:
-        sell_prices = np.array([o.price for o in sell_list]) / ONE_DOLLAR
-        sell_qtys = np.array([o.quantity for o in sell_list])
-        idx_sell = np.argsort(sell_prices)
-        sell_prices_sorted = sell_prices[idx_sell]
-        sell_qtys_sorted = sell_qtys[idx_sell]
-        sell_cumulative = np.cumsum(sell_qtys_sorted)
-    else:
-        sell_prices_sorted = np.array([])
-        sell_cumulative = np.array([])
+    sell_prices_sorted = sell_prices * _INV_ONE_DOLLAR
+    sell_cumulative = np.cumsum(sell_qtys)
 
     fig, ax = plt.subplots(figsize=(8, 5))
 
@@ -217,3 +222,4 @@ def plot_order_book(market: Market, market_hash_name: MarketHashName):
     ax.legend(loc="upper left")
     plt.tight_layout()
     plt.show()
+    plt.close(fig)